@@ -80,12 +80,10 @@ def _get_uvloop():
     return uvloop
 
 
-def get_event_loop(uvloop=False):
+def get_event_loop(uvloop=True):
     if uvloop:
         # activate uvloop if lib is present
         try:
-            import uvloop
-
             asyncio.set_event_loop_policy(_get_uvloop().EventLoopPolicy())
         except Exception as e:
             logger.warning(
@@ -224,7 +222,11 @@ def run(action, config_file, log_level, filebeat, service_type, uvloop):
     default=None,
     help="Service type to get default configuration for if action is config.",
 )
-@click.option("--uvloop", is_flag=True, default=False, help="Use uvloop if possible.")
+@click.option(
+    "--uvloop/--no-uvloop",
+    default=True,
+    help="Use uvloop if possible. Enabled by default.",
+)
 def main(action, config_file, log_level, filebeat, service_type, uvloop):
     """Entry point to the service, responsible for all operations.
 
@@ -171,6 +171,17 @@ class MultiService:
 
     async def run(self):
         """Runs every service in a task and wait for all tasks."""
+        if hasattr(asyncio, "TaskGroup"):  # Python 3.11+
+            # TaskGroup is cheaper than gather/wait and cancels every sibling
+            # atomically when one service raises.
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    for service in self._services:
+                        tg.create_task(service.run())
+            except BaseExceptionGroup:
+                logger.exception("A service failed:")
+            return
+
         tasks = [asyncio.create_task(service.run()) for service in self._services]
 
         _, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
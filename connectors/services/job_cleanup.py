@@ -7,12 +7,15 @@
 A task periodically clean up orphaned and idle jobs.
 """
 
+import asyncio
+
 from connectors.es.index import DocumentNotFoundError
 from connectors.es.management_client import ESManagementClient
 from connectors.protocol import ConnectorIndex, SyncJobIndex
 from connectors.services.base import BaseService
 
 IDLE_JOB_ERROR = "The job has not seen any update for some time."
+ORPHANED_JOBS_BATCH_SIZE = 1000
 
 
 class JobCleanUpService(BaseService):
@@ -49,24 +52,34 @@ class JobCleanUpService(BaseService):
     async def _process_orphaned_idle_jobs(self):
         try:
             self.logger.debug("Cleaning up orphaned idle jobs")
-            connector_ids = [
+            connector_ids = {
                 connector.id
                 async for connector in self.connector_index.all_connectors()
-            ]
+            }
 
             marked_count = total_count = 0
+            # Fail jobs in bounded batches as they stream in, so the working
+            # set stays O(batch) no matter how large the backlog is.
+            batch = []
+
+            async def _fail_batch(jobs):
+                results = await asyncio.gather(
+                    *(self._fail_orphaned_idle_job(job) for job in jobs)
+                )
+                return sum(results)
+
             async for job in self.sync_job_index.orphaned_idle_jobs(
-                connector_ids=connector_ids
+                connector_ids=list(connector_ids)
             ):
-                try:
-                    await job.fail(IDLE_JOB_ERROR)
-                    marked_count += 1
-                except Exception as e:
-                    self.logger.error(
-                        f"Failed to mark orphaned idle job #{job.id} as error: {e}"
-                    )
-                finally:
-                    total_count += 1
+                batch.append(job)
+                if len(batch) >= ORPHANED_JOBS_BATCH_SIZE:
+                    marked_count += await _fail_batch(batch)
+                    total_count += len(batch)
+                    batch.clear()
+
+            if batch:
+                marked_count += await _fail_batch(batch)
+                total_count += len(batch)
 
             if total_count == 0:
                 self.logger.debug("No orphaned idle jobs found. Skipping...")
@@ -78,6 +91,16 @@ class JobCleanUpService(BaseService):
             self.logger.error(e, exc_info=True)
             self.raise_if_spurious(e)
 
+    async def _fail_orphaned_idle_job(self, job):
+        try:
+            await job.fail(IDLE_JOB_ERROR)
+            return True
+        except Exception as e:
+            self.logger.error(
+                f"Failed to mark orphaned idle job #{job.id} as error: {e}"
+            )
+            return False
+
     async def _process_idle_jobs(self):
         try:
             self.logger.debug("Start cleaning up idle jobs...")
@@ -89,44 +112,82 @@ class JobCleanUpService(BaseService):
                 )
             ]
 
-            marked_count = total_count = 0
-            async for job in self.sync_job_index.idle_jobs(connector_ids=connector_ids):
-                job_id = job.id
-                try:
-                    connector_id = job.connector_id
+            jobs = [
+                job
+                async for job in self.sync_job_index.idle_jobs(
+                    connector_ids=connector_ids
+                )
+            ]
 
-                    await job.fail(IDLE_JOB_ERROR)
-                    marked_count += 1
+            if len(jobs) == 0:
+                self.logger.debug("No idle jobs found. Skipping...")
+                return
+
+            # Fetch each connector once instead of once per job, and run the
+            # independent ES round-trips concurrently in bounded batches.
+            job_connector_ids = list({job.connector_id for job in jobs})
+            connectors = {}
+            for i in range(0, len(job_connector_ids), ORPHANED_JOBS_BATCH_SIZE):
+                id_batch = job_connector_ids[i : i + ORPHANED_JOBS_BATCH_SIZE]
+                connectors.update(
+                    zip(
+                        id_batch,
+                        await asyncio.gather(
+                            *(
+                                self.connector_index.fetch_by_id(doc_id=connector_id)
+                                for connector_id in id_batch
+                            ),
+                            return_exceptions=True,
+                        ),
+                        strict=True,
+                    )
+                )
 
-                    try:
-                        connector = await self.connector_index.fetch_by_id(
-                            doc_id=connector_id
+            marked_count = 0
+            for i in range(0, len(jobs), ORPHANED_JOBS_BATCH_SIZE):
+                job_batch = jobs[i : i + ORPHANED_JOBS_BATCH_SIZE]
+                marked = await asyncio.gather(
+                    *(
+                        self._mark_idle_job_as_error(
+                            job, connectors.get(job.connector_id)
                         )
-                    except DocumentNotFoundError:
-                        self.logger.warning(
-                            f"Could not found connector by id #{connector_id}"
-                        )
-                        continue
-
-                    try:
-                        await job.reload()
-                    except DocumentNotFoundError:
-                        self.logger.warning(f"Could not reload sync job #{job_id}")
-                        job = None
-                    await connector.sync_done(job=job)
-                except Exception as e:
-                    self.logger.error(
-                        f"Failed to mark idle job #{job_id} as error: {e}"
+                        for job in job_batch
                     )
-                finally:
-                    total_count += 1
-
-            if total_count == 0:
-                self.logger.debug("No idle jobs found. Skipping...")
-            else:
-                self.logger.info(
-                    f"Successfully marked #{marked_count} out of #{total_count} idle jobs as error."
                 )
+                marked_count += sum(marked)
+
+            self.logger.info(
+                f"Successfully marked #{marked_count} out of #{len(jobs)} idle jobs as error."
+            )
         except Exception as e:
             self.logger.error(e, exc_info=True)
             self.raise_if_spurious(e)
+
+    async def _mark_idle_job_as_error(self, job, connector):
+        """Marks a single idle job as error and notifies its connector.
+
+        Returns whether the job was successfully marked.
+        """
+        job_id = job.id
+        marked = False
+        try:
+            await job.fail(IDLE_JOB_ERROR)
+            marked = True
+
+            if isinstance(connector, DocumentNotFoundError):
+                self.logger.warning(
+                    f"Could not found connector by id #{job.connector_id}"
+                )
+                return marked
+            elif isinstance(connector, BaseException):
+                raise connector
+
+            try:
+                await job.reload()
+            except DocumentNotFoundError:
+                self.logger.warning(f"Could not reload sync job #{job_id}")
+                job = None
+            await connector.sync_done(job=job)
+        except Exception as e:
+            self.logger.error(f"Failed to mark idle job #{job_id} as error: {e}")
+        return marked
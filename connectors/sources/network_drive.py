@@ -6,9 +6,12 @@
 """Network Drive source module responsible to fetch documents from Network Drive."""
 
 import asyncio
+import base64
 import csv
+import re
 from collections import deque
-from functools import cached_property, partial
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache, partial
 
 import fastjsonschema
 import requests.exceptions
@@ -66,12 +69,23 @@ STATUS_ACCOUNT_DISABLED = 3221225586
 STATUS_PASSWORD_MUST_CHANGE = 3221226020
 
 MAX_CHUNK_SIZE = 65536
+# SMB2 credit windows routinely allow 1 MiB+ reads; bigger chunks mean fewer
+# round-trips per file.
+READ_CHUNK_SIZE = 1024 * 1024
+MAX_CONCURRENT_SCANS = 16
+# The connector is I/O bound: a dedicated pool keeps SMB/WinRM round-trips
+# from competing with other libraries for asyncio's default executor.
+SMB_IO_THREADS = 32
 RETRIES = 3
 RETRY_INTERVAL = 2
 
 WINDOWS = "windows"
 LINUX = "linux"
 
+# Key-value row of PowerShell tabular output: everything up to the last
+# whitespace-separated token is the key, the token is the value.
+PARSE_OUTPUT_PATTERN = re.compile(r"^[ \t]*(\S(?:.*\S)?)[ \t]+(\S+)[ \t\r]*$", re.M)
+
 
 class UserAccountDisabledException(Exception):
     pass
@@ -93,10 +107,14 @@ class NoLogonServerException(Exception):
     pass
 
 
+# The same identities show up once per ACE and once per group per user, so
+# memoizing the pure prefix helpers turns repeat calls into a dict lookup.
+@lru_cache(maxsize=8192)
 def _prefix_user(user):
     return prefix_identity("user", user)
 
 
+@lru_cache(maxsize=8192)
 def _prefix_rid(rid):
     return prefix_identity("rid", rid)
 
@@ -116,7 +134,9 @@ class NetworkDriveAdvancedRulesValidator(AdvancedRulesValidator):
     }
 
     SCHEMA_DEFINITION = {"type": "array", "items": RULES_OBJECT_SCHEMA_DEFINITION}
-    SCHEMA = fastjsonschema.compile(definition=SCHEMA_DEFINITION)
+    # compiled once at class definition; staticmethod so the callable can be
+    # reached through instances without function-descriptor binding
+    SCHEMA = staticmethod(fastjsonschema.compile(definition=SCHEMA_DEFINITION))
 
     def __init__(self, source):
         self.source = source
@@ -131,7 +151,7 @@ class NetworkDriveAdvancedRulesValidator(AdvancedRulesValidator):
 
     async def validate_pattern(self, advanced_rules):
         try:
-            NetworkDriveAdvancedRulesValidator.SCHEMA(advanced_rules)
+            self.SCHEMA(advanced_rules)
         except fastjsonschema.JsonSchemaValueException as e:
             return SyncRuleValidationResult(
                 rule_id=SyncRuleValidationResult.ADVANCED_RULES,
@@ -165,19 +185,27 @@ class SecurityInfo:
         self.password = password
 
     def get_descriptor(self, file_descriptor, info):
-        """Get the Security Descriptor for the opened file."""
+        """Get the Security Descriptor for the opened file.
+
+        The query request is built fresh per call on purpose: smbprotocol
+        structures share their Field objects under copy.copy (so a reused
+        prototype would be mutated concurrently) and deepcopy is slower
+        than plain construction.
+        """
         query_request = SMB2QueryInfoRequest()
         query_request["info_type"] = InfoType.SMB2_0_INFO_SECURITY
         query_request["output_buffer_length"] = MAX_CHUNK_SIZE
         query_request["additional_information"] = info
         query_request["file_id"] = file_descriptor.file_id
 
-        req = file_descriptor.connection.send(
+        connection = file_descriptor.connection
+        tree_connect = file_descriptor.tree_connect
+        req = connection.send(
             query_request,
-            sid=file_descriptor.tree_connect.session.session_id,
-            tid=file_descriptor.tree_connect.tree_connect_id,
+            sid=tree_connect.session.session_id,
+            tid=tree_connect.tree_connect_id,
         )
-        response = file_descriptor.connection.receive(req)
+        response = connection.receive(req)
         query_response = SMB2QueryInfoResponse()
         query_response.unpack(response["data"].get_value())
 
@@ -228,20 +256,13 @@ class SecurityInfo:
                 "Key 3": "Value3"
             }
         """
-        formatted_result = {}
         output_lines = raw_output.std_out.decode().splitlines()
 
         #  Ignoring initial headers with fixed length of 2
-        if len(output_lines) > 2:
-            for line in output_lines[3:]:
-                parts = line.rsplit(maxsplit=1)
-                if len(parts) == 2:
-                    key, value = parts
-                    key = key.strip()
-                    value = value.strip()
-                    formatted_result[key] = value
+        if len(output_lines) <= 2:
+            return {}
 
-        return formatted_result
+        return dict(PARSE_OUTPUT_PATTERN.findall("\n".join(output_lines[3:])))
 
     def fetch_users(self):
         users = self.session.run_ps(GET_USERS_COMMAND)
@@ -344,6 +365,16 @@ class NASDataSource(BaseDataSource):
     def smb_connection(self):
         return SMBSession(self.server_ip, self.username, self.password, self.port)
 
+    @cached_property
+    def _executor(self):
+        return ThreadPoolExecutor(max_workers=SMB_IO_THREADS, thread_name_prefix="smb")
+
+    async def _run_io(self, func, *args):
+        """Runs blocking SMB/WinRM I/O in the dedicated executor."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
     @classmethod
     def get_default_configuration(cls):
         """Get the default configuration for Network Drive.
@@ -437,6 +468,17 @@ class NASDataSource(BaseDataSource):
         }
         return document
 
+    def _scan_directory(self, path):
+        """Scans a directory and consumes the listing inside the worker thread."""
+        return list(
+            smbclient.scandir(
+                path=path,
+                username=self.username,
+                password=self.password,
+                port=self.port,
+            )
+        )
+
     @retryable(
         retries=RETRIES,
         interval=RETRY_INTERVAL,
@@ -452,49 +494,44 @@ class NASDataSource(BaseDataSource):
         stack.append(path)
 
         while stack:
-            current_path = stack.pop()
-
-            directory_info = []
-            try:
-                directory_info = list(
-                    await asyncio.to_thread(
-                        partial(
-                            smbclient.scandir,
-                            path=current_path,
-                            username=self.username,
-                            password=self.password,
-                            port=self.port,
-                        ),
+            # Directory scans are independent SMB round-trips, so run a
+            # bounded batch of them concurrently instead of one at a time.
+            batch = [stack.pop() for _ in range(min(len(stack), MAX_CONCURRENT_SCANS))]
+            scans = await asyncio.gather(
+                *(self._run_io(self._scan_directory, path) for path in batch),
+                return_exceptions=True,
+            )
+            for current_path, directory_info in zip(batch, scans, strict=True):
+                # these are exception values returned by gather, not an active
+                # exception, so pass them explicitly instead of relying on
+                # logger.exception picking up sys.exc_info()
+                if isinstance(directory_info, SMBConnectionClosed):
+                    self._logger.error(
+                        f"Connection got closed. Error {directory_info}. Registering new session",
+                        exc_info=directory_info,
                     )
-                )
+                    await self._run_io(self.smb_connection.create_connection)
+                    raise directory_info
+                elif isinstance(directory_info, (SMBOSError, SMBException)):
+                    self._logger.error(
+                        f"Error while scanning the path {current_path}. Error {directory_info}",
+                        exc_info=directory_info,
+                    )
+                    continue
+                elif isinstance(directory_info, BaseException):
+                    raise directory_info
                 for file in directory_info:
                     yield self.format_document(file=file)
                     if file.is_dir():
                         stack.append(file.path)
-            except SMBConnectionClosed as exception:
-                self._logger.exception(
-                    f"Connection got closed. Error {exception}. Registering new session"
-                )
-                await asyncio.to_thread(self.smb_connection.create_connection)
-                raise
-            except (SMBOSError, SMBException) as exception:
-                self._logger.exception(
-                    f"Error while scanning the path {current_path}. Error {exception}"
-                )
-                continue
 
-    def is_match_with_previous_rules(
-        self, file_path, indexed_rules, match_with_previous_rules
-    ):
-        # Check if the file is matched with any of the previous indexed rules
-        for indexed_rule in indexed_rules:
-            if not match_with_previous_rules:
-                match_with_previous_rules = glob.globmatch(
-                    file_path, indexed_rule, flags=glob.GLOBSTAR
-                )
-                if match_with_previous_rules:
-                    break
-        return match_with_previous_rules
+    def _compile_glob_patterns(self, patterns):
+        """Translates glob patterns into a single alternation regex, so each
+        file is matched in one C-level pass instead of one globmatch per rule.
+        """
+        return re.compile(
+            "|".join(glob.translate(list(patterns), flags=glob.GLOBSTAR)[0])
+        )
 
     @retryable(
         retries=RETRIES,
@@ -506,6 +543,11 @@ class NASDataSource(BaseDataSource):
         self._logger.debug(
             "Fetching the directory tree from remote server and content of directory on path"
         )
+        pattern_matcher = self._compile_glob_patterns([glob_pattern])
+        indexed_matcher = (
+            self._compile_glob_patterns(indexed_rules) if indexed_rules else None
+        )
+
         stack = deque()
         stack.append(path)
 
@@ -513,7 +555,7 @@ class NASDataSource(BaseDataSource):
             directory_info = []
             current_path = stack.pop()
             try:
-                directory_info = await asyncio.to_thread(
+                directory_info = await self._run_io(
                     partial(
                         smbclient.scandir,
                         path=current_path,
@@ -521,24 +563,19 @@ class NASDataSource(BaseDataSource):
                     ),
                 )
                 for file in directory_info:
-                    match_with_previous_rules = False
                     if file.is_dir():
                         stack.append(file.path)
                     file_path = file.path.split("/", 1)[1].replace("\\", "/")
-                    is_file_match = glob.globmatch(
-                        file_path, glob_pattern, flags=glob.GLOBSTAR
-                    )
-                    match_with_previous_rules = self.is_match_with_previous_rules(
-                        file_path, indexed_rules, match_with_previous_rules
-                    )
 
-                    if not match_with_previous_rules and is_file_match:
+                    if pattern_matcher.match(file_path) and not (
+                        indexed_matcher and indexed_matcher.match(file_path)
+                    ):
                         yield self.format_document(file=file)
             except SMBConnectionClosed as exception:
                 self._logger.exception(
                     f"Connection got closed. Error {exception}. Registering new session"
                 )
-                await asyncio.to_thread(self.smb_connection.create_connection)
+                await self._run_io(self.smb_connection.create_connection)
                 raise
             except (SMBOSError, SMBException) as exception:
                 self._logger.exception(
@@ -599,21 +636,25 @@ class NASDataSource(BaseDataSource):
     async def ping(self):
         """Verify the connection with Network Drive"""
 
-        await asyncio.to_thread(self.smb_connection.create_connection)
+        await self._run_io(self.smb_connection.create_connection)
         await self.close()
         self._logger.info("Successfully connected to the Network Drive")
 
     async def close(self):
-        """Close all the open smb sessions"""
-        if self.smb_connection.session is None:
-            return
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(
-            executor=None,
-            func=partial(
-                smbclient.delete_session, server=self.server_ip, port=self.port
-            ),
-        )
+        """Close all the open smb sessions and release the I/O executor"""
+        try:
+            if self.smb_connection.session is not None:
+                await self._run_io(
+                    partial(
+                        smbclient.delete_session, server=self.server_ip, port=self.port
+                    )
+                )
+        finally:
+            # drop the cached executor so a later sync on this source
+            # (e.g. after ping, which closes the session) starts a fresh one
+            if "_executor" in self.__dict__:
+                self._executor.shutdown(wait=False)
+                del self.__dict__["_executor"]
 
     async def fetch_file_content(self, path):
         """Fetches the file content from the given drive path
@@ -623,24 +664,66 @@ class NASDataSource(BaseDataSource):
         """
         self._logger.debug(f"Fetching the contents of file on path: {path}")
         try:
-            with smbclient.open_file(
-                path=path,
-                encoding="utf-8",
-                errors="ignore",
-                mode="rb",
-                username=self.username,
-                password=self.password,
-                port=self.port,
-            ) as file:
-                chunk = True
-                while chunk:
-                    chunk = file.read(MAX_CHUNK_SIZE) or b""
+            # the open and close are SMB CREATE/CLOSE round-trips, so they
+            # belong in the executor just like the reads
+            file = await self._run_io(
+                partial(
+                    smbclient.open_file,
+                    path=path,
+                    encoding="utf-8",
+                    errors="ignore",
+                    mode="rb",
+                    username=self.username,
+                    password=self.password,
+                    port=self.port,
+                )
+            )
+            try:
+                while chunk := await self._run_io(file.read, READ_CHUNK_SIZE):
                     yield chunk
+            finally:
+                await self._run_io(file.close)
         except SMBOSError as error:
             self._logger.error(
                 f"Cannot read the contents of file on path:{path}. Error {error}"
             )
 
+    async def _stream_file_to_b64(self, path, file_size=0):
+        """Base64-encodes the file content as chunks stream in from the drive.
+
+        Encoding 3-byte aligned slices incrementally keeps a single chunk in
+        memory at a time, instead of buffering the whole file and encoding it
+        in one shot. The output buffer is pre-sized from the known file size,
+        so encoded slices land in place instead of being joined at the end.
+
+        Args:
+            path (str): The file path of the file on the Network Drive
+            file_size (int, optional): Size of the file, used to pre-allocate
+                the output buffer. Defaults to 0 (grow as needed).
+
+        Returns:
+            str: Base64-encoded file content
+        """
+        out = bytearray(4 * ((int(file_size or 0) + 2) // 3))
+        written = 0
+        remainder = b""
+
+        def _write(encoded):
+            nonlocal written
+            out[written : written + len(encoded)] = encoded
+            written += len(encoded)
+
+        async for chunk in self.fetch_file_content(path):
+            if remainder:
+                chunk = remainder + chunk
+            boundary = len(chunk) - (len(chunk) % 3)
+            _write(base64.b64encode(chunk[:boundary]))
+            remainder = chunk[boundary:]
+        if remainder:
+            _write(base64.b64encode(remainder))
+        del out[written:]
+        return out.decode()
+
     async def get_content(self, file, timestamp=None, doit=None):
         """Get the content for a given file
 
@@ -669,12 +752,25 @@ class NASDataSource(BaseDataSource):
             "_timestamp": file["_timestamp"],
         }
 
-        return await self.download_and_extract_file(
-            document,
-            filename,
-            file_extension,
-            partial(self.fetch_file_content, path=file["path"]),
-        )
+        if self.configuration.get("use_text_extraction_service"):
+            return await self.download_and_extract_file(
+                document,
+                filename,
+                file_extension,
+                partial(self.fetch_file_content, path=file["path"]),
+            )
+
+        try:
+            document["_attachment"] = await self._stream_file_to_b64(
+                file["path"], file_size
+            )
+        except Exception as e:
+            self._logger.warning(
+                f"Streaming the content of file {filename} failed: {e}",
+                exc_info=True,
+            )
+            return
+        return document
 
     def list_file_permission(self, file_path, file_type, mode, access):
         try:
@@ -711,20 +807,23 @@ class NASDataSource(BaseDataSource):
             allow_permissions, deny_permissions = await self.get_entity_permission(
                 file_path=file_path, file_type=file_type, groups_info=groups_info
             )
-            entity_permissions = list(set(allow_permissions) - set(deny_permissions))
-            document[ACCESS_CONTROL] = list(
-                set(document.get(ACCESS_CONTROL, []) + entity_permissions)
-            )
+            entity_permissions = set(allow_permissions)
+            entity_permissions.difference_update(deny_permissions)
+
+            existing = document.get(ACCESS_CONTROL)
+            if existing:
+                document[ACCESS_CONTROL] = list({*existing, *entity_permissions})
+            else:
+                document[ACCESS_CONTROL] = list(entity_permissions)
         return document
 
     async def _user_access_control_doc(self, user, sid, groups_info=None):
         rid = str(sid).split("-")[-1]
         prefixed_username = _prefix_user(user)
         rid_user = _prefix_rid(rid)
-        rid_groups = []
-
-        for group_sid in groups_info or []:
-            rid_groups.append(_prefix_rid(group_sid.split("-")[-1]))
+        rid_groups = [
+            _prefix_rid(group_sid.split("-")[-1]) for group_sid in groups_info or []
+        ]
 
         access_control = [rid_user, prefixed_username, *rid_groups]
 
@@ -761,16 +860,19 @@ class NASDataSource(BaseDataSource):
         self._logger.info(
             f"Fetching all groups and members for drive at path '{self.drive_path}'"
         )
-        groups_info = await asyncio.to_thread(self.security_info.fetch_groups)
-
-        groups_members = {}
-        for group_name, group_sid in groups_info.items():
-            rid = group_sid.split("-")[-1]
-            groups_members[rid] = await asyncio.to_thread(
-                self.security_info.fetch_members, group_name
+        groups_info = await self._run_io(self.security_info.fetch_groups)
+
+        # Each member lookup is an independent WinRM round-trip, so fetch
+        # them concurrently instead of one group at a time.
+        members = await asyncio.gather(
+            *(
+                self._run_io(self.security_info.fetch_members, group_name)
+                for group_name in groups_info
             )
+        )
+        rids = (group_sid.split("-")[-1] for group_sid in groups_info.values())
 
-        return groups_members
+        return dict(zip(rids, members, strict=True))
 
     async def get_access_control(self):
         if not self._dls_enabled():
@@ -798,7 +900,7 @@ class NASDataSource(BaseDataSource):
                 self._logger.info(
                     f"Fetching all users for drive at path '{self.drive_path}'"
                 )
-                users_info = await asyncio.to_thread(self.security_info.fetch_users)
+                users_info = await self._run_io(self.security_info.fetch_users)
 
                 for user, sid in users_info.items():
                     yield await self._user_access_control_doc(
@@ -823,20 +925,24 @@ class NASDataSource(BaseDataSource):
         allow_permissions = []
         deny_permissions = []
         if file_type == "file":
-            list_permissions = await asyncio.to_thread(
-                self.list_file_permission,
-                file_path=file_path,
-                file_type="file",
-                mode="rb",
-                access=FilePipePrinterAccessMask.READ_CONTROL,
+            list_permissions = await self._run_io(
+                partial(
+                    self.list_file_permission,
+                    file_path=file_path,
+                    file_type="file",
+                    mode="rb",
+                    access=FilePipePrinterAccessMask.READ_CONTROL,
+                )
             )
         else:
-            list_permissions = await asyncio.to_thread(
-                self.list_file_permission,
-                file_path=file_path,
-                file_type="dir",
-                mode="br",
-                access=DirectoryAccessMask.READ_CONTROL,
+            list_permissions = await self._run_io(
+                partial(
+                    self.list_file_permission,
+                    file_path=file_path,
+                    file_type="dir",
+                    mode="br",
+                    access=DirectoryAccessMask.READ_CONTROL,
+                )
             )
         for permission in list_permissions or []:
             # Access mask indicates specific permission within an ACE, such as read in deny ACE.
@@ -876,7 +982,7 @@ class NASDataSource(BaseDataSource):
         Yields:
             dictionary: Dictionary containing the Network Drive files and folders as documents
         """
-        await asyncio.to_thread(self.smb_connection.create_connection)
+        await self._run_io(self.smb_connection.create_connection)
         if filtering and filtering.has_advanced_rules():
             advanced_rules = filtering.get_advanced_rules()
             async for document in self.fetch_filtered_directory(advanced_rules):
@@ -891,19 +997,68 @@ class NASDataSource(BaseDataSource):
 
         else:
             groups_info = {}
+            # Prefetch the WinRM group enumeration so it overlaps with the
+            # first directory scans instead of delaying the whole traversal.
+            groups_prefetch = None
             if self.drive_type == WINDOWS and self._dls_enabled():
-                groups_info = await self.fetch_groups_info()
-
-            async for document in self.traverse_diretory(
-                path=rf"\\{self.server_ip}/{self.drive_path}"
-            ):
-                yield (
-                    await self._decorate_with_access_control(
-                        document, document["path"], document["type"], groups_info
-                    ),
-                    (
-                        partial(self.get_content, document)
-                        if document["type"] == "file"
-                        else None
-                    ),
+                groups_prefetch = asyncio.create_task(self.fetch_groups_info())
+
+            async def _decorate_batch(documents):
+                nonlocal groups_info, groups_prefetch
+                if groups_prefetch is not None:
+                    groups_info = await groups_prefetch
+                    groups_prefetch = None
+                # The permission fetch opens each entry again over SMB, so
+                # decorate a bounded batch concurrently instead of one
+                # round-trip at a time.
+                return await asyncio.gather(
+                    *(
+                        self._decorate_with_access_control(
+                            document, document["path"], document["type"], groups_info
+                        )
+                        for document in documents
+                    )
                 )
+
+            try:
+                batch = []
+                async for document in self.traverse_diretory(
+                    path=rf"\\{self.server_ip}/{self.drive_path}"
+                ):
+                    batch.append(document)
+                    if len(batch) >= MAX_CONCURRENT_SCANS:
+                        for decorated in await _decorate_batch(batch):
+                            yield (
+                                decorated,
+                                (
+                                    partial(self.get_content, decorated)
+                                    if decorated["type"] == "file"
+                                    else None
+                                ),
+                            )
+                        batch = []
+
+                for decorated in await _decorate_batch(batch):
+                    yield (
+                        decorated,
+                        (
+                            partial(self.get_content, decorated)
+                            if decorated["type"] == "file"
+                            else None
+                        ),
+                    )
+            finally:
+                # If the traversal failed or the generator was closed before
+                # the first batch was decorated, don't leave the WinRM
+                # enumeration running as an abandoned task.
+                if groups_prefetch is not None:
+                    groups_prefetch.cancel()
+                    try:
+                        await groups_prefetch
+                    except asyncio.CancelledError:
+                        pass
+                    except Exception:
+                        self._logger.debug(
+                            "Groups prefetch failed while shutting down",
+                            exc_info=True,
+                        )
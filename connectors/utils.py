@@ -44,39 +44,42 @@ DEFAULT_CONCURRENT_DOWNLOADS = 10
 # Regular expression pattern to match a basic email format (no whitespace, valid domain)
 EMAIL_REGEX_PATTERN = r"^\S+@\S+\.\S+$"
 
-TIKA_SUPPORTED_FILETYPES = [
-    ".txt",
-    ".py",
-    ".rst",
-    ".html",
-    ".markdown",
-    ".json",
-    ".xml",
-    ".csv",
-    ".md",
-    ".ppt",
-    ".rtf",
-    ".docx",
-    ".odt",
-    ".xls",
-    ".xlsx",
-    ".rb",
-    ".paper",
-    ".sh",
-    ".pptx",
-    ".pdf",
-    ".doc",
-    ".aspx",
-    ".xlsb",
-    ".xlsm",
-    ".tsv",
-    ".svg",
-    ".msg",
-    ".potx",
-    ".vsd",
-    ".vsdx",
-    ".vsdm",
-]
+# frozenset: membership is checked once per file in every content sync
+TIKA_SUPPORTED_FILETYPES = frozenset(
+    [
+        ".txt",
+        ".py",
+        ".rst",
+        ".html",
+        ".markdown",
+        ".json",
+        ".xml",
+        ".csv",
+        ".md",
+        ".ppt",
+        ".rtf",
+        ".docx",
+        ".odt",
+        ".xls",
+        ".xlsx",
+        ".rb",
+        ".paper",
+        ".sh",
+        ".pptx",
+        ".pdf",
+        ".doc",
+        ".aspx",
+        ".xlsb",
+        ".xlsm",
+        ".tsv",
+        ".svg",
+        ".msg",
+        ".potx",
+        ".vsd",
+        ".vsdx",
+        ".vsdm",
+    ]
+)
 
 ISO_ZULU_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
 
@@ -8,7 +8,6 @@ Collection of fake source classes for tests
 """
 
 from functools import partial
-from unittest.mock import Mock
 
 from connectors.filtering.validation import (
     FilteringValidationResult,
@@ -16,20 +15,38 @@ from connectors.filtering.validation import (
 )
 from connectors.source import BaseDataSource
 
+# shared by every large document so the generator does not re-build the
+# payload on each yield
+_BIG_PAYLOAD = "big" * 4 * 1024
+
+
+class _FakeError:
+    """Cheap stand-in for a validation error.
+
+    No ``__slots__``: ``FilteringValidationResult.to_dict`` calls ``vars()``
+    on each error, so the instance needs a ``__dict__``.
+    """
+
+    def __repr__(self):
+        return "<FakeError>"
+
 
 class FakeSource(BaseDataSource):
     """Fakey"""
 
     name = "Fakey"
     service_type = "fake"
+    _DOC = {"_id": "1"}
 
     def __init__(self, configuration):
         self.configuration = configuration
-        if configuration.has_field("raise"):
+        has_field = configuration.has_field
+        if has_field("raise"):
             msg = "I break on init"
             raise Exception(msg)
-        self.fail = configuration.has_field("fail")
-        self.configuration_invalid = configuration.has_field("configuration_invalid")
+        self.fail = has_field("fail")
+        self.configuration_invalid = has_field("configuration_invalid")
+        self._dl_cache = {}
 
     async def changed(self):
         return True
@@ -45,22 +62,34 @@ class FakeSource(BaseDataSource):
             return
         return {"_id": doc_id, "_timestamp": timestamp, "text": "xx"}
 
+    def _dl_for(self, doc_id):
+        # memoize the per-doc download callables so repeated iterations
+        # don't rebuild a partial per yielded document
+        dl = self._dl_cache.get(doc_id)
+        if dl is None:
+            dl = self._dl_cache[doc_id] = partial(self._dl, doc_id)
+        return dl
+
     async def get_docs(self, filtering=None):
         if self.fail:
             msg = "I fail while syncing"
             raise Exception(msg)
-        yield {"_id": "1"}, partial(self._dl, "1")
+        # the sink mutates yielded docs in place (pops "_id", stamps the
+        # timestamp), so hand out a copy of the precomputed template
+        yield dict(self._DOC), self._dl_for("1")
 
     @classmethod
     def get_default_configuration(cls):
         return {}
 
+    # validation results are never mutated by callers, so one shared
+    # instance per class is enough
+    _RESULT = FilteringValidationResult(state=FilteringValidationState.VALID, errors=[])
+
     @classmethod
     async def validate_filtering(cls, filtering):
         # being explicit about that this result should always be valid
-        return FilteringValidationResult(
-            state=FilteringValidationState.VALID, errors=[]
-        )
+        return cls._RESULT
 
     async def validate_config(self):
         if self.configuration_invalid:
@@ -81,12 +110,12 @@ class FakeSourceFilteringValid(FakeSource):
     name = "Source with valid filtering."
     service_type = "filtering_state_valid"
 
+    # use separate fake source to not rely on the behaviour in FakeSource which is used in many tests
+    _RESULT = FilteringValidationResult(state=FilteringValidationState.VALID, errors=[])
+
     @classmethod
     async def validate_filtering(cls, filtering):
-        # use separate fake source to not rely on the behaviour in FakeSource which is used in many tests
-        return FilteringValidationResult(
-            state=FilteringValidationState.VALID, errors=[]
-        )
+        return cls._RESULT
 
 
 class FakeSourceFilteringStateInvalid(FakeSource):
@@ -95,9 +124,11 @@ class FakeSourceFilteringStateInvalid(FakeSource):
     name = "Source with filtering in state invalid."
     service_type = "filtering_state_invalid"
 
+    _RESULT = FilteringValidationResult(state=FilteringValidationState.INVALID)
+
     @classmethod
     async def validate_filtering(cls, filtering):
-        return FilteringValidationResult(state=FilteringValidationState.INVALID)
+        return cls._RESULT
 
 
 class FakeSourceFilteringStateEdited(FakeSource):
@@ -106,9 +137,11 @@ class FakeSourceFilteringStateEdited(FakeSource):
     name = "Source with filtering in state edited."
     service_type = "filtering_state_edited"
 
+    _RESULT = FilteringValidationResult(state=FilteringValidationState.EDITED)
+
     @classmethod
     async def validate_filtering(cls, filtering):
-        return FilteringValidationResult(state=FilteringValidationState.EDITED)
+        return cls._RESULT
 
 
 class FakeSourceFilteringErrorsPresent(FakeSource):
@@ -117,9 +150,11 @@ class FakeSourceFilteringErrorsPresent(FakeSource):
     name = "Source with filtering errors."
     service_type = "filtering_errors_present"
 
+    _RESULT = FilteringValidationResult(errors=[_FakeError()])
+
     @classmethod
     async def validate_filtering(cls, filtering):
-        return FilteringValidationResult(errors=[Mock()])
+        return cls._RESULT
 
 
 class FakeSourceTS(FakeSource):
@@ -128,12 +163,7 @@ class FakeSourceTS(FakeSource):
     name = "Fake source with stable TS"
     service_type = "fake_ts"
     ts = "2022-10-31T09:04:35.277558"
-
-    async def get_docs(self, filtering=None):
-        if self.fail:
-            msg = "I fail while syncing"
-            raise Exception(msg)
-        yield {"_id": "1", "_timestamp": self.ts}, partial(self._dl, "1")
+    _DOC = {"_id": "1", "_timestamp": ts}
 
 
 class FailsThenWork(FakeSource):
@@ -141,14 +171,22 @@ class FailsThenWork(FakeSource):
 
     name = "Buggy"
     service_type = "fail_once"
+    # class-level on purpose: the framework builds a fresh source per sync
+    # attempt, and the flag has to survive across instances to fail exactly
+    # once per process
     fail = True
 
+    @classmethod
+    def reset(cls):
+        """Re-arm the fail-once flag so suites can reuse this fixture."""
+        cls.fail = True
+
     async def get_docs(self, filtering=None):
         if FailsThenWork.fail:
             FailsThenWork.fail = False
             msg = "I fail while syncing"
             raise Exception(msg)
-        yield {"_id": "1"}, partial(self._dl, "1")
+        yield dict(self._DOC), self._dl_for("1")
 
 
 class LargeFakeSource(FakeSource):
@@ -156,11 +194,11 @@ class LargeFakeSource(FakeSource):
 
     name = "Large Fake"
     service_type = "large_fake"
+    _IDS = tuple(str(i) for i in range(1, 1002))
 
     async def get_docs(self, filtering=None):
-        for i in range(1001):
-            doc_id = str(i + 1)
-            yield {"_id": doc_id, "data": "big" * 4 * 1024}, partial(self._dl, doc_id)
+        for doc_id in self._IDS:
+            yield {"_id": doc_id, "data": _BIG_PAYLOAD}, self._dl_for(doc_id)
 
 
 class PremiumFake(FakeSource):
@@ -6,6 +6,7 @@
 """Tests the Network Drive source class methods."""
 
 import asyncio
+import base64
 import csv
 import datetime
 from unittest import mock
@@ -305,11 +306,6 @@ async def test_fetch_file_when_file_is_inaccessible(file_mock, caplog):
             )
 
 
-async def create_fake_coroutine(data):
-    """create a method for returning fake coroutine value"""
-    return data
-
-
 @pytest.mark.asyncio
 async def test_get_content():
     """Test get_content method of Network Drive"""
@@ -330,9 +326,10 @@ async def test_get_content():
         }
 
         # Execute
-        source.download_and_extract_file = mock.MagicMock(
-            return_value=create_fake_coroutine(expected_output)
-        )
+        async def fake_file_content(path):
+            yield b"Mock...."
+
+        source.fetch_file_content = fake_file_content
         actual_response = await source.get_content(mock_response, doit=True)
 
         # Assert
@@ -359,15 +356,36 @@ async def test_get_content_with_upper_extension():
         }
 
         # Execute
-        source.download_and_extract_file = mock.MagicMock(
-            return_value=create_fake_coroutine(expected_output)
-        )
+        async def fake_file_content(path):
+            yield b"Mock...."
+
+        source.fetch_file_content = fake_file_content
         actual_response = await source.get_content(mock_response, doit=True)
 
         # Assert
         assert actual_response == expected_output
 
 
+@pytest.mark.asyncio
+async def test_stream_file_to_b64_chunk_boundaries():
+    """Test that streamed base64 encoding matches a one-shot encode for uneven chunks"""
+    # Setup
+    async with create_source(NASDataSource) as source:
+        chunks = [b"Mock", b".", b"...", b"Mock....."]
+
+        async def fake_file_content(path):
+            for chunk in chunks:
+                yield chunk
+
+        source.fetch_file_content = fake_file_content
+
+        # Execute
+        attachment = await source._stream_file_to_b64("\\1.2.3.4/Users/file1.txt")
+
+        # Assert
+        assert attachment == base64.b64encode(b"".join(chunks)).decode()
+
+
 @pytest.mark.asyncio
 async def test_get_content_when_doit_false():
     """Test get_content method when doit is false."""
@@ -449,9 +467,7 @@ async def test_fetch_file_when_file_is_accessible(file_mock):
     async with create_source(NASDataSource) as source:
         path = "\\1.2.3.4/Users/file1.txt"
 
-        file_mock.return_value.__enter__.return_value.read = mock.MagicMock(
-            side_effect=side_effect_function
-        )
+        file_mock.return_value.read = mock.MagicMock(side_effect=side_effect_function)
 
         # Execute
         async for response in source.fetch_file_content(path=path):
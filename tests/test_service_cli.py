@@ -226,3 +226,20 @@ def test_uvloop_error(patched_logger, patched_asyncio, patched_uvloop):
     patched_logger.warning.assert_any_call(
         "Unable to enable uvloop: import fails. Running with default event loop"
     )
+
+
+@patch("connectors.service_cli._get_uvloop")
+@patch("connectors.service_cli.asyncio")
+def test_uvloop_enabled_by_default(patched_asyncio, patched_uvloop):
+    get_event_loop()
+    patched_asyncio.set_event_loop_policy.assert_called_once_with(
+        patched_uvloop.return_value.EventLoopPolicy.return_value
+    )
+
+
+@patch("connectors.service_cli._get_uvloop")
+@patch("connectors.service_cli.asyncio")
+def test_uvloop_opt_out(patched_asyncio, patched_uvloop):
+    get_event_loop(False)
+    patched_uvloop.assert_not_called()
+    patched_asyncio.set_event_loop_policy.assert_not_called()